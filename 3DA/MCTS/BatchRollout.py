@@ -0,0 +1,345 @@
+from typing import TYPE_CHECKING
+from game.Card import Color, COLOR_INDEX
+import random
+
+try:
+    import numpy as np
+except ImportError: # optional, MCTS falls back to one rollout per iteration without it
+    np = None
+
+if TYPE_CHECKING:
+    from game.TDA import TDA
+
+available = np is not None
+
+COLORS = len(Color)
+COLUMNS = 13 * COLORS
+GOLD, SILVER, COPPER, BRONZE, BRASS, RED, BLACK, GREEN, WHITE, BLUE = (COLOR_INDEX[color] for color in Color)
+
+def column(card) -> int:
+    """Hands and the ante are kept as card counts in value major order, column (value-1)*10 + color,
+    so the lowest and highest valued cards are the first and last non zero columns."""
+    return (card.value.value - 1) * COLORS + COLOR_INDEX[card.color]
+
+def rollouts(state: "TDA", size: int) -> "np.ndarray":
+    """Plays size copies of state to the end of the gambit at once, returns the AI's final game scores."""
+    return Batch(state, size, np.random.default_rng(random.getrandbits(64))).run()
+
+
+class Batch:
+    """Many simulations of the same gambit advanced in lock step, one array row per simulation.
+    Follows the same rules as TDA.simTurn with the random (simulation) decider's choices:
+    opponents draw from their NumToProb model, the AI plays a random card from its hand."""
+
+    def __init__(self, state: "TDA", size: int, rng: "np.random.Generator"):
+        self.size = size
+        self.seats = state.numPlayers
+        self.ai = state.numPlayers - 1
+        self.rng = rng
+        self.rows = np.arange(size)
+        players = state.players + [state.AIPlayer]
+        tile = lambda values: np.tile(np.array(values, dtype=np.int64), (size, 1))
+
+        self.gold = tile([player.gold for player in players])
+        self.cardCount = tile([player.cardCount for player in state.players] + [0]) # the AI's hand is self.hand
+        self.length = tile([len(player.flight.cards) for player in players])
+        self.total = tile([player.flight.total for player in players])
+        self.goods = tile([player.flight.goods for player in players])
+        self.last = tile([player.flight.cards[-1].value.value if player.flight.cards else 0 for player in players])
+        self.valueCount = np.tile(np.array([player.flight.value_count for player in players], dtype=np.int64), (size, 1, 1))
+        # colour flights only need how many cards of each colour and the two lowest values
+        counts = np.zeros((self.seats, COLORS), dtype=np.int64)
+        lows = np.full((self.seats, COLORS, 2), 99, dtype=np.int64)
+        for seat, player in enumerate(players):
+            for card in player.flight.cards:
+                c = COLOR_INDEX[card.color]
+                counts[seat, c] += 1
+                lows[seat, c] = sorted([*lows[seat, c], card.value.value])[:2]
+        self.colorCount = np.tile(counts, (size, 1, 1))
+        self.colorLow1 = np.tile(lows[:, :, 0], (size, 1, 1))
+        self.colorLow2 = np.tile(lows[:, :, 1], (size, 1, 1))
+
+        hand = np.zeros(COLUMNS, dtype=np.int64)
+        for card in state.AIPlayer.cards:
+            hand[column(card)] += 1
+        self.hand = np.tile(hand, (size, 1))
+        ante = np.zeros(COLUMNS, dtype=np.int64)
+        for card in state.ante.cards:
+            ante[column(card)] += 1
+        self.ante = np.tile(ante, (size, 1))
+        self.anteValue = np.full(size, state.ante.value, dtype=np.int64)
+
+        self.turn = np.full(size, state.turn, dtype=np.int64)
+        self.prev = np.full(size, state.prev.value, dtype=np.int64)
+        # cumulative, normalised like random.choices does (the prior's weights don't sum to 1)
+        numToProb = np.array([np.cumsum([player.NumToProb[v] for v in range(1, 14)]) for player in state.players])
+        self.numToProb = numToProb / numToProb[:, -1:]
+        self.over = np.full(size, state.isGambitOver())
+
+        self.powers = {
+            GOLD: self.goldPower,
+            SILVER: self.silverPower,
+            BRONZE: self.bronzePower,
+            BRASS: self.brassPower,
+            RED: self.redPower,
+            BLACK: self.blackPower,
+            GREEN: self.greenPower,
+            WHITE: self.whitePower,
+            BLUE: self.bluePower,
+        }
+
+    def run(self) -> "np.ndarray":
+        while not self.over.all():
+            self.step()
+        return self.endGambit()
+
+    def step(self):
+        """One turn in every simulation that is still running."""
+        rows = np.nonzero(~self.over)[0]
+        seats = self.turn[rows]
+        isAI = seats == self.ai
+        handSize = self.hand[rows].sum(1)
+        cards = np.where(isAI, handSize, self.cardCount[rows, seats])
+        buying = cards <= 1
+        if buying.any():
+            self.buy(rows[buying], seats[buying], 4 - cards[buying])
+
+        values = np.empty(len(rows), dtype=np.int64)
+        colors = self.rng.integers(0, COLORS, len(rows))
+        opp = ~isAI
+        if opp.any():
+            draws = self.rng.random(opp.sum())
+            values[opp] = np.minimum((self.numToProb[seats[opp]] < draws[:, None]).sum(1) + 1, 13)
+        if isAI.any():
+            taken = self.takeRandom(rows[isAI])
+            values[isAI] = taken // COLORS + 1
+            colors[isAI] = taken % COLORS
+
+        self.play(rows, seats, values, colors, self.prev[rows])
+        self.cardCount[rows[opp], seats[opp]] -= 1
+        self.turn[rows] = (seats + 1) % self.seats
+        self.prev[rows] = values
+
+        # everyone has played this round, the unique highest card starts the next one
+        lengths = self.length[rows]
+        done = (lengths == lengths[:, :1]).all(1) & (lengths[:, 0] > 0)
+        if done.any():
+            ended = rows[done]
+            last = self.last[ended]
+            unique = (last[:, :, None] == last[:, None, :]).sum(2) == 1
+            key = np.where(unique, last, 0)
+            starts = key.max(1) > 0
+            self.turn[ended[starts]] = key[starts].argmax(1)
+            self.prev[ended[starts]] = 13
+
+        self.over[rows] = self.gambitOver(rows)
+
+    def gambitOver(self, rows: "np.ndarray") -> "np.ndarray":
+        lengths = self.length[rows]
+        even = (lengths.min(1) >= 3) & (lengths == lengths[:, :1]).all(1)
+        totals = np.sort(self.total[rows], 1)
+        return even & (totals[:, -1] > totals[:, -2])
+
+    def endGambit(self) -> "np.ndarray":
+        """Pays colour flights and the ante, returns the AI's score (gold plus coin value of its hand)."""
+        flights = np.where(self.colorCount >= 3, self.colorLow2, 0).sum(2)
+        self.gold += flights * self.seats
+        self.gold -= flights.sum(1)[:, None]
+        bestOpp = self.total[:, :self.ai].max(1)
+        winner = np.where(self.total[:, self.ai] > bestOpp, self.ai, self.total[:, :self.ai].argmax(1))
+        self.gold[self.rows, winner] += self.anteValue
+        coinValues = 2 + (np.arange(COLUMNS) // COLORS + 1) / 3.6
+        return self.gold[:, self.ai] + self.hand @ coinValues
+
+    def play(self, rows, seats, values, colors, prev):
+        """Adds the cards to the flights and resolves the powers they trigger, including Copper's chains."""
+        triggered = self.addCard(rows, seats, values, colors, prev)
+        (rows, seats, values, colors) = (rows[triggered], seats[triggered], values[triggered], colors[triggered])
+        while len(rows):
+            for (color, power) in self.powers.items():
+                matches = colors == color
+                if matches.any():
+                    power(rows[matches], seats[matches], values[matches])
+            copper = colors == COPPER
+            (rows, seats, values) = (rows[copper], seats[copper], values[copper])
+            if not len(rows):
+                break
+            # Copper swaps itself for a (value 6 guess) card off the deck, whose power always triggers
+            self.length[rows, seats] -= 1
+            self.total[rows, seats] -= values
+            self.goods[rows, seats] -= 1
+            values = np.full(len(rows), 6, dtype=np.int64)
+            colors = self.rng.integers(0, COLORS, len(rows))
+            self.addCard(rows, seats, values, colors, np.full(len(rows), 13, dtype=np.int64))
+
+    def addCard(self, rows, seats, values, colors, prev) -> "np.ndarray":
+        """Flight.addCard for many rows, returns which cards trigger their power."""
+        triggered = values <= prev
+        # a triggered Copper leaves the flight again, it never counts towards value or colour flights
+        counted = ~((colors == COPPER) & triggered)
+        self.length[rows, seats] += 1
+        self.total[rows, seats] += values
+        self.goods[rows, seats] += colors < 5
+        self.last[rows, seats] = values
+        self.valueCount[rows, seats, values] += counted
+
+        (r, s, v, c) = (rows[counted], seats[counted], values[counted], colors[counted])
+        self.colorCount[r, s, c] += 1
+        low1 = self.colorLow1[r, s, c]
+        self.colorLow2[r, s, c] = np.minimum(self.colorLow2[r, s, c], np.maximum(low1, v))
+        self.colorLow1[r, s, c] = np.minimum(low1, v)
+
+        flight = self.valueCount[rows, seats, values] == 3
+        if flight.any():
+            (r, s, v) = (rows[flight], seats[flight], values[flight])
+            self.gold[r, s] += v
+            self.anteValue[r] -= np.minimum(v, self.anteValue[r])
+            self.takeAnte(r, s, highest=True)
+        return triggered
+
+    def buy(self, rows, seats, num):
+        payment = self.rng.integers(1, 14, len(rows))
+        self.anteValue[rows] += payment
+        self.gold[rows, seats] -= payment
+        isAI = seats == self.ai
+        self.cardCount[rows[~isAI], seats[~isAI]] += num[~isAI]
+        (rows, num) = (rows[isAI], num[isAI])
+        for k in range(num.max(initial=0)):
+            drawing = rows[num > k]
+            self.draw(drawing, self.rng.integers(1, 14, len(drawing)))
+
+    def draw(self, rows, values):
+        """A card of the given value and a random colour into the AI's hand."""
+        self.hand[rows, (values - 1) * COLORS + self.rng.integers(0, COLORS, len(rows))] += 1
+
+    def takeRandom(self, rows) -> "np.ndarray":
+        """Removes a uniformly random card from each row's AI hand, returns the columns."""
+        cumulative = self.hand[rows].cumsum(1)
+        pick = (self.rng.random(len(rows)) * cumulative[:, -1])
+        columns = (cumulative > pick[:, None]).argmax(1)
+        self.hand[rows, columns] -= 1
+        return columns
+
+    def takeAnte(self, rows, seats, highest: bool):
+        """Up to two of the lowest (or highest) ante cards go to the seat's hand."""
+        for _ in range(2):
+            left = self.ante[rows].sum(1) > 0
+            (rows, seats) = (rows[left], seats[left])
+            if not len(rows):
+                return
+            present = self.ante[rows] > 0
+            columns = COLUMNS - 1 - present[:, ::-1].argmax(1) if highest else present.argmax(1)
+            self.ante[rows, columns] -= 1
+            isAI = seats == self.ai
+            self.hand[rows[isAI], columns[isAI]] += 1
+            self.cardCount[rows[~isAI], seats[~isAI]] += 1
+
+    def giveCard(self, rows, receivers, givers, values, above: bool):
+        """Brass and Green: the giver hands over a card, or the receiver gets 5 gold."""
+        fromAI = givers == self.ai
+        (r, s) = (rows[fromAI], receivers[fromAI])
+        if len(r):
+            # the AI gives its lowest card that qualifies, as AIPlayer.decideCard does in simulations
+            cardValues = np.arange(COLUMNS) // COLORS + 1
+            good = np.arange(COLUMNS) % COLORS < 5
+            if above:
+                qualifies = (cardValues[None, :] > values[fromAI][:, None]) & good[None, :]
+            else:
+                qualifies = (cardValues[None, :] < values[fromAI][:, None]) & ~good[None, :]
+            eligible = qualifies & (self.hand[r] > 0)
+            gives = eligible.any(1)
+            columns = eligible.argmax(1)
+            self.hand[r[gives], columns[gives]] -= 1
+            self.cardCount[r[gives], s[gives]] += 1
+            empty = r[gives][self.hand[r[gives]].sum(1) == 0]
+            self.buy(empty, np.full(len(empty), self.ai), np.full(len(empty), 4))
+            self.gold[r[~gives], self.ai] -= 5
+            self.gold[r[~gives], s[~gives]] += 5
+
+        (r, s, g, v) = (rows[~fromAI], receivers[~fromAI], givers[~fromAI], values[~fromAI])
+        gives = self.rng.random(len(r)) < .5
+        self.cardCount[r[gives], g[gives]] -= 1
+        out = gives & (self.cardCount[r, g] == 0)
+        self.buy(r[out], g[out], np.full(out.sum(), 4))
+        toAI = gives & (s == self.ai)
+        self.draw(r[toAI], np.maximum(v[toAI] // 2, 1))
+        toOpp = gives & (s != self.ai)
+        self.cardCount[r[toOpp], s[toOpp]] += 1
+        self.gold[r[~gives], g[~gives]] -= 5
+        self.gold[r[~gives], s[~gives]] += 5
+
+    def pickOpponent(self, rows, seats, strongest: bool) -> "np.ndarray":
+        """Red and White: the opponent with the biggest (or smallest) flight, ties broken at random."""
+        key = self.total[rows] + self.rng.random((len(rows), self.seats)) * .5
+        if strongest:
+            key[np.arange(len(rows)), seats] = -np.inf
+            return key.argmax(1)
+        key[np.arange(len(rows)), seats] = np.inf
+        return key.argmin(1)
+
+    def goldPower(self, rows, seats, values):
+        isAI = seats == self.ai
+        self.cardCount[rows[~isAI], seats[~isAI]] += self.goods[rows[~isAI], seats[~isAI]]
+        (rows, goods) = (rows[isAI], self.goods[rows[isAI], self.ai])
+        for k in range(goods.max(initial=0)):
+            drawing = rows[goods > k]
+            self.draw(drawing, np.full(len(drawing), 6))
+
+    def silverPower(self, rows, seats, values):
+        for seat in range(self.ai):
+            self.cardCount[rows, seat] += self.goods[rows, seat] > 0
+        drawing = rows[self.goods[rows, self.ai] > 0]
+        self.draw(drawing, np.full(len(drawing), 6))
+
+    def bronzePower(self, rows, seats, values):
+        self.takeAnte(rows, seats, highest=False)
+
+    def brassPower(self, rows, seats, values):
+        givers = np.where(seats == self.ai, self.ai - 1, np.where(seats == 0, self.ai, seats - 1))
+        self.giveCard(rows, seats, givers, values, True)
+
+    def greenPower(self, rows, seats, values):
+        givers = np.where(seats == self.ai, 0, np.where(seats == self.ai - 1, self.ai, seats + 1))
+        self.giveCard(rows, seats, givers, values, False)
+
+    def redPower(self, rows, seats, values):
+        targets = self.pickOpponent(rows, seats, True)
+        self.gold[rows, targets] -= 1
+        fromAI = targets == self.ai
+        (r, t) = (rows[~fromAI], targets[~fromAI])
+        self.cardCount[r, t] -= 1
+        out = self.cardCount[r, t] == 0
+        self.buy(r[out], t[out], np.full(out.sum(), 4))
+        r = rows[fromAI]
+        r = r[self.hand[r].sum(1) > 0]
+        self.takeRandom(r)
+        empty = r[self.hand[r].sum(1) == 0]
+        self.buy(empty, np.full(len(empty), self.ai), np.full(len(empty), 4))
+
+        self.gold[rows, seats] += 1
+        isAI = seats == self.ai
+        self.cardCount[rows[~isAI], seats[~isAI]] += 1
+        self.draw(rows[isAI], np.full(isAI.sum(), 6))
+
+    def blackPower(self, rows, seats, values):
+        amount = np.minimum(3, self.anteValue[rows])
+        self.anteValue[rows] -= amount
+        self.gold[rows, seats] += amount
+
+    def whitePower(self, rows, seats, values):
+        targets = self.pickOpponent(rows, seats, False)
+        self.gold[rows, targets] -= 2
+        self.gold[rows, seats] += 2
+
+    def bluePower(self, rows, seats, values):
+        raising = self.rng.random(len(rows)) < .5
+        (r, s) = (rows[raising], seats[raising])
+        amount = self.length[r, s]
+        paying = np.ones((len(r), self.seats), dtype=bool)
+        paying[np.arange(len(r)), s] = False
+        self.gold[r] -= paying * amount[:, None]
+        self.anteValue[r] += amount * (self.seats - 1)
+        # otherwise every seat, the player included, pays the player 1
+        (r, s) = (rows[~raising], seats[~raising])
+        self.gold[r] -= 1
+        self.gold[r, s] += self.seats
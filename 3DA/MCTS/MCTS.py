@@ -1,101 +1,224 @@
 from .Node import Node
+from .Transpositions import TranspositionTable
+from . import BatchRollout
 import game.TDA as TDA
 from game.Card import Value
 import game.Cards as Cards
+import game.Trace as Trace
+import game.Deciders as Deciders
+from game.Trace import Level
 import time
 import math
-from copy import deepcopy
 import random
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+
+def cardKey(card) -> tuple:
+    return (card.color.value, card.value.value)
+
+def addStats(stats: dict, card, totalScore: float, visits: int):
+    entry = stats.get(cardKey(card))
+    if entry:
+        entry[1] += totalScore
+        entry[2] += visits
+    else:
+        stats[cardKey(card)] = [card, totalScore, visits]
+
+def rootValue(root: Node) -> float:
+    """What the root is worth to the AI: the mean score of its best move."""
+    visited = [child for child in root.children.values() if child.visits]
+    if not visited:
+        return 0
+    return max(child.totalScore / child.visits for child in visited)
+
+def searchWorker(iters: int, timeLimit: float, tableSize: int, batch: int, state: TDA, seed: int) -> dict:
+    """Runs one independent tree in a worker process and returns its root statistics."""
+    random.seed(seed)
+    return MCTS(iters, timeLimit, tableSize=tableSize, batch=batch).rootStats(state)
 
 class MCTS:
-    def __init__(self, iters, time):
+    def __init__(self, iters, time, workers: int = 1, tableSize: int = 0, reuse: bool = False, batch: int = 0):
         self.iterLimit = iters
         self.timeLimit = time #seconds
+        self.workers = workers # independent trees searched in parallel, merged at the root
+        self.tableSize = tableSize # transposition table entries, 0 keeps statistics per node
+        self.reuse = reuse # keep the tree and continue from it on the next AI turn of the gambit
+        self.batch = batch # rollouts per leaf played at once with NumPy, 0 plays one rollout per iteration
+        self.root: Node = None
+        self.rootHistory = None # the gambit's history list and how much of it the root had seen
+        self.rootPly = 0
 
     def search(self, state: TDA):
-        while True and state.turn == state.numPlayers - 1:
-            user = input("Simulate AI turn? (y)\n")
-            if user == "y":
-                break
-            else:
-                print("Invalid input, try again")
-        thisState = deepcopy(state)
-        root = Node(thisState)
+        if state.turn == state.numPlayers - 1:
+            Deciders.get().confirmSearch()
+        if self.workers > 1:
+            stats = self.parallelStats(state)
+        else:
+            stats = self.rootStats(state)
+
+        if Trace.enabled(Level.Summary):
+            print("------ search complete --------")
+            print(list(stats.values()))
+        if not stats:
+            return (None, 0)
+        best = max(stats.values(), key=lambda entry: entry[1] / entry[2])
+        return (best[0], best[1]/best[2])
 
+    def parallelStats(self, state: TDA) -> dict:
+        """Root parallelisation: every worker grows its own tree from the same state,
+        visits and scores of the root moves are summed afterwards."""
+        seeds = [random.randrange(2**32) for _ in range(self.workers)]
+        merged = {}
+        # game.Cards has to be imported first to resolve the game package's circular imports,
+        # which matters for spawned (non-forked) workers
+        with ProcessPoolExecutor(self.workers, initializer=importlib.import_module, initargs=("game.Cards",)) as pool:
+            futures = [pool.submit(searchWorker, self.iterLimit, self.timeLimit, self.tableSize, self.batch, state, seed) for seed in seeds]
+            for future in futures:
+                for (card, totalScore, visits) in future.result().values():
+                    addStats(merged, card, totalScore, visits)
+        return merged
+
+    def rootStats(self, state: TDA) -> dict:
+        """Searches one tree, returns {card key: [card, totalScore, visits]} for the root's children."""
+        root = self.grow(state)
+        stats = {}
+        for card, child in root.children.items():
+            if child.visits:
+                addStats(stats, card, child.totalScore, child.visits)
+        return stats
+
+    def reroot(self, state: TDA) -> Node:
+        """Finds the node for state below the last search's root by following the cards played since.
+        Returns None (start a fresh tree) if the gambit changed or a play was never expanded."""
+        if not self.reuse or self.root is None or state.history is not self.rootHistory:
+            return None
+        node = self.root
+        for card in state.history[self.rootPly:]:
+            node = node.children.get(card)
+            if node is None:
+                return None
+        # simulated powers may have dealt the AI a different hand, the moves below would not be playable
+        if not node.isAI or sorted(c.code for c in node.state.AIPlayer.cards) != sorted(c.code for c in state.AIPlayer.cards):
+            return None
+        Trace.log(Level.Summary, "Reusing tree with %d visits", node.visits)
+        node.parent = None
+        node.state = state.clone()
+        node.startingPoint = node.state.getGameScore()
+        return node
+
+    def grow(self, state: TDA) -> Node:
+        root = self.reroot(state) if state.turn == state.numPlayers - 1 else None
+        if root is None:
+            root = self.newRoot(state)
+        table = TranspositionTable(self.tableSize) if self.tableSize else None
+        self.iterate(root, self.iterLimit, time.time() + self.timeLimit, table)
+
+        if self.reuse:
+            self.root = root
+            self.rootHistory = state.history
+            self.rootPly = len(state.history)
+        return root
+
+    def newRoot(self, state: TDA) -> Node:
+        root = Node(state.clone())
         if root.state.turn != root.state.numPlayers - 1:
             root.state.turn += 1
         while root.state.turn != root.state.numPlayers - 1:
             root.state.simTurn(None)
+        return root
 
+    def race(self, candidates: list) -> tuple:
+        """Picks between alternative states for the AI's turn, candidates being [(option, state)].
+        Successive halving: the time and iteration budgets are split over log2(n) rounds, each round
+        searches every remaining candidate's tree equally and drops the worse half.
+        Candidates are ranked on their starting score plus the expected change, the options
+        can cost different amounts up front. Returns (option, score) for the best one."""
+        roots = [(option, self.newRoot(state)) for (option, state) in candidates]
+        table = TranspositionTable(self.tableSize) if self.tableSize else None
+        value = lambda root: rootValue(root) + root.startingPoint / (root.state.playerGold * root.state.numPlayers)
+        rounds = max(1, math.ceil(math.log2(len(roots))))
         startTime = time.time()
+        for r in range(rounds):
+            roundTime = self.timeLimit / rounds
+            for (option, root) in roots:
+                deadline = min(startTime + (r+1)*roundTime, time.time() + roundTime/len(roots))
+                self.iterate(root, max(1, self.iterLimit // (rounds*len(roots))), deadline, table)
+            roots.sort(key=lambda entry: value(entry[1]), reverse=True)
+            Trace.log(Level.Summary, "Race round %d: %s", r, [(option, value(root)) for (option, root) in roots])
+            if r < rounds - 1:
+                roots = roots[:math.ceil(len(roots)/2)]
+        (option, root) = roots[0]
+        return (option, value(root))
 
-        for i in range(self.iterLimit):
-            print(f"------ iteration {i} --------")
-            if time.time() - startTime > self.timeLimit:
+    def iterate(self, root: Node, iters: int, deadline: float, table: TranspositionTable = None):
+        for i in range(iters):
+            Trace.log(Level.Iteration, "------ iteration %d --------", i)
+            if time.time() > deadline:
                 break
 
             thisNode = root
 
             #Step 1: Selection
             while thisNode.isFullyExpanded() and thisNode.children:
-                print("Selecting best child...\n")
-                print()
+                Trace.log(Level.Step, "Selecting best child...\n")
                 thisNode = thisNode.bestChild()
                 parent = thisNode.parent
-                if parent:
+                if parent and Trace.enabled(Level.Step):
                     for key, child in parent.children.items():
                         if child == thisNode:
                             print(f"This node is a child under the key: {key}\n")
                             break
             
-            print("\nAI Player's cards and flight:\n")
-            print(thisNode.state.AIPlayer.cards)
-            print(thisNode.state.AIPlayer.flight.cards)
+            if Trace.enabled(Level.Step):
+                print("\nAI Player's cards and flight:\n")
+                print(thisNode.state.AIPlayer.cards)
+                print(thisNode.state.AIPlayer.flight.cards)
             
             #Step 2: Expansion
             if thisNode.state.turn == thisNode.state.numPlayers - 1:
                 validCards = thisNode.state.AIPlayer.cards
             else:
-                validColors = [color for color in TDA.Color]
-                validVals = [num for num in TDA.Value]
-                validCards = [Cards.COLOR_TO_CLASS[color](value) for color in validColors for value in validVals]
+                validCards = Cards.ALL_CARDS
             unexplored = [card for card in validCards if card not in thisNode.children]
 
             if unexplored and not thisNode.state.isGambitOver():
                 thisCard = random.choice(unexplored)
-                print(f"Expanding with card {thisCard.color.value} {thisCard.value.value}")
-                newState: TDA = deepcopy(thisNode.state)
+                Trace.log(Level.Step, "Expanding with card %s %d", thisCard.color.value, thisCard.value.value)
+                newState: TDA = thisNode.state.clone()
                 newState.simTurn(thisCard)
-                newNode = Node(newState, thisNode)
+                newNode = Node(newState, thisNode, table.get(newState.stateHash()) if table is not None else None)
                 thisNode.children[thisCard] = newNode
                 thisNode = newNode
             
             #Step 3: Simulation
-            simState : TDA = deepcopy(thisNode.state)
-            while not simState.isGambitOver():
-                print(f"Simulating player {simState.turn}...\n")
-                validCards = simState.AIPlayer.cards
-                simCard = random.choice(validCards)
-                simState.simTurn(simCard)
-            print("Simulation complete...\n")
-            simState.endGambit()
+            (visits, result) = self.rollout(thisNode.state)
             
             #Step 4: Backpropagation
-            result = simState.getGameScore()
-            print("Backpropagating...\n")
-            print(f"Result: {result}")
+            Trace.log(Level.Iteration, "Backpropagating... Result: %s over %d rollouts", result, visits)
 
+            stepTrace = Trace.enabled(Level.Step)
             while thisNode:
-                thisNode.visits += 1
-                print("Init: ", thisNode.startingPoint)
-                print("Final: ", result)
-                print(f"Incrementng by: {(result-thisNode.startingPoint)/(thisNode.state.playerGold * thisNode.state.numPlayers)}")
-                thisNode.totalScore += (result-thisNode.startingPoint)/(thisNode.state.playerGold * thisNode.state.numPlayers)
+                thisNode.visits += visits
+                if stepTrace:
+                    print("Init: ", thisNode.startingPoint)
+                    print("Final: ", result)
+                    print(f"Incrementng by: {(result-visits*thisNode.startingPoint)/(thisNode.state.playerGold * thisNode.state.numPlayers)}")
+                thisNode.totalScore += (result-visits*thisNode.startingPoint)/(thisNode.state.playerGold * thisNode.state.numPlayers)
                 thisNode = thisNode.parent
 
-        print("------ search complete --------")
-        print([(child, root.children[child].totalScore, root.children[child].visits) for child in root.children])
-        if not root.children:
-            return (None, 0)
-        best = max(root.children, key=lambda card: (root.children[card].totalScore / root.children[card].visits))
-        return (best, root.children[best].totalScore/root.children[best].visits)
\ No newline at end of file
+    def rollout(self, state: TDA) -> tuple:
+        """Plays state to the end of the gambit, returns (rollouts, sum of final scores).
+        With batch set (and NumPy installed) that many rollouts are played at once as arrays."""
+        if self.batch and BatchRollout.available:
+            results = BatchRollout.rollouts(state, self.batch)
+            return (len(results), float(results.sum()))
+        simState : TDA = state.clone()
+        while not simState.isGambitOver():
+            Trace.log(Level.Step, "Simulating player %d...\n", simState.turn)
+            if simState.turn == simState.numPlayers - 1:
+                simState.simTurn(random.choice(simState.AIPlayer.cards))
+            else:
+                simState.simTurn(None)
+        Trace.log(Level.Step, "Simulation complete...\n")
+        simState.endGambit(True)
+        return (1, simState.getGameScore())
@@ -1,21 +1,43 @@
 import game.TDA as TDA
+import game.Trace as Trace
+from .Transpositions import Stats
 import math
 import random
 
 class Node:
-    def __init__(self, state: TDA, parent: 'Node' = None):
+    __slots__ = ("state", "parent", "children", "stats", "startingPoint", "isAI")
+
+    def __init__(self, state: TDA, parent: 'Node' = None, stats: Stats = None):
         self.state = state  # Game state (3DA)
         self.parent = parent  # Parent Node
         self.children = {}  # Map of move -> child node
-        self.visits = 0  # Number of times this node was visited
-        self.totalScore = 0  # Number of wins from this node
+        self.stats = stats if stats is not None else Stats()  # visits and score, possibly shared with transpositions
         self.startingPoint = state.getGameScore()
         self.isAI = state.turn == state.numPlayers - 1
 
+    @property
+    def visits(self):
+        """Number of times this node was visited"""
+        return self.stats.visits
+
+    @visits.setter
+    def visits(self, visits):
+        self.stats.visits = visits
+
+    @property
+    def totalScore(self):
+        """Sum of the normalised score changes seen from this node"""
+        return self.stats.totalScore
+
+    @totalScore.setter
+    def totalScore(self, totalScore):
+        self.stats.totalScore = totalScore
+
     def isFullyExpanded(self):
         """Returns True if all possible moves have been explored."""
         if self.state.turn == self.state.numPlayers - 1:
-            return len(self.children) == len(self.state.AIPlayer.cards) or self.state.isGambitOver()
+            # identical cards in hand are the same (interned) move
+            return len(self.children) == len(set(self.state.AIPlayer.cards)) or self.state.isGambitOver()
         else:
             return len(self.children) == (len(TDA.Color)) or self.state.isGambitOver()
 
@@ -30,8 +52,9 @@ class Node:
                 return child  # Always explore unvisited nodes first
 
         # Apply UCB1 formula with handling for 0 visits
-        print("Child scores:")
-        for node in valid_children:
-            print(node.totalScore / node.visits)
+        if Trace.enabled(Trace.Level.Step):
+            print("Child scores:")
+            for node in valid_children:
+                print(node.totalScore / node.visits)
         return max(valid_children, key=lambda node: 
             (node.totalScore / node.visits) + exploration_weight * math.sqrt(math.log(1 + self.visits) / (1 + node.visits)))
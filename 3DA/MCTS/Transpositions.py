@@ -0,0 +1,30 @@
+from collections import OrderedDict
+
+class Stats:
+    __slots__ = ("visits", "totalScore")
+
+    def __init__(self):
+        self.visits = 0
+        self.totalScore = 0
+
+class TranspositionTable:
+    """Bounded map of TDA.stateHash() -> Stats so nodes for the same state share their statistics.
+    The least recently used entry is dropped once full, nodes that still hold it keep counting privately."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries: OrderedDict = OrderedDict()
+
+    def get(self, key: int) -> Stats:
+        stats = self.entries.get(key)
+        if stats is not None:
+            self.entries.move_to_end(key)
+            return stats
+        stats = Stats()
+        self.entries[key] = stats
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return stats
+
+    def __len__(self):
+        return len(self.entries)
@@ -27,16 +27,9 @@ def play_game():
     
     game = TDA(numPlayers, playerGold, AICards)
 
-    while not game.isGameOver():
-        game.playAnte()
-        round = 1
-        while not game.isGambitOver():
-            game.playRound(round)
-            round += 1
-        game.endGambit()
-        game.dealCards()
+    game.playGame()
     
     print("Game over...")
-    print(game.checkWinner())
+    game.checkWinner()
 
 play_game()
\ No newline at end of file
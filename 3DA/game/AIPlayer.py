@@ -3,45 +3,58 @@ from .Card import *
 from .Ante import Ante
 import game.Flight as Flight
 from MCTS.MCTS import MCTS
-from copy import deepcopy
+import game.Trace as Trace
+import game.Deciders as Deciders
 
 if TYPE_CHECKING:
     from .TDA import TDA
 
 class AIPlayer:
-    def __init__(self, gold: int, cards: List[Card]):
+    __slots__ = ("gold", "cards", "flight", "MCTS", "decisionTime")
+
+    def __init__(self, gold: int, cards: List[Card], workers: int = 1, decisionTime: float = 10):
         self.gold = gold
         self.cards = cards
         self.flight = Flight.Flight()
-        self.MCTS = MCTS(100000, 20)
+        # workers > 1 searches that many independent trees in a process pool
+        self.MCTS = MCTS(100000, 20, workers, reuse=True)
+        self.decisionTime = decisionTime # seconds the table waits on a give card or gold decision
+
+    def clone(self) -> "AIPlayer":
+        # the search object is shared, copies only carry the game state
+        other = AIPlayer.__new__(AIPlayer)
+        other.gold = self.gold
+        other.cards = self.cards.copy()
+        other.flight = self.flight.clone()
+        other.MCTS = self.MCTS
+        other.decisionTime = self.decisionTime
+        return other
     
     def ante(self, game: "TDA"):
-        anteMCTS = MCTS(100000, 9)
-        thisGame = deepcopy(game)
+        """Races the lower half of the hand as ante candidates under one shared search budget."""
+        anteMCTS = MCTS(100000, 9, self.MCTS.workers)
+        thisGame = game.clone()
         thisGame.turn = thisGame.numPlayers - 1
-        outcomes = []
         thisGame.AIPlayer.cards.sort(key=lambda x: x.value.value)
-        cardsToCheck = thisGame.AIPlayer.cards[:len(thisGame.AIPlayer.cards)//2 + 1]
-        print(cardsToCheck)
+        cardsToCheck = list(dict.fromkeys(thisGame.AIPlayer.cards[:len(thisGame.AIPlayer.cards)//2 + 1]))
+        Trace.log(Trace.Level.Summary, "Ante candidates: %s", cardsToCheck)
+        candidates = []
         for card in cardsToCheck:
-            ante = []
-            thisGame.AIPlayer.cards.remove(card)
-            ante.append(card)
-            for player in thisGame.players:
+            candidate = thisGame.clone()
+            candidate.AIPlayer.cards.remove(card)
+            ante = [card]
+            for player in candidate.players:
                 ante.append(player.determineAnte())
                 player.cardCount -= 1
-            thisGame.ante = Ante(ante)
-            outcomes.append((card, anteMCTS.search(thisGame)[1]))
-            thisGame.AIPlayer.cards.append(card)
-            for player in thisGame.players:
-                player.cardCount += 1
-        outcomes.sort(key=lambda x: x[1], reverse=True)
-        anteCard = outcomes[0][0]
+            candidate.ante = Ante(ante)
+            candidates.append((card, candidate))
+        Deciders.get().confirmSearch()
+        (anteCard, score) = anteMCTS.race(candidates)
         for card in self.cards:
             if card.color == anteCard.color and card.value == anteCard.value:
                 self.cards.remove(card)
                 break
-        print(f"\n\n **** AI ADVICE: ante {anteCard.color.value} {anteCard.value.value}\n")
+        Trace.report(False, "\n\n **** AI ADVICE: ante %s %d\n", anteCard.color.value, anteCard.value.value)
         return anteCard
     
     def playTurn(self, game: "TDA", prev: Value) -> Card:
@@ -50,13 +63,14 @@ class AIPlayer:
             self.gold -= payment
             self.cards += cards
         playCard = self.MCTS.search(game)[0]
-        print(f"\n\n AI player's turn...\n***** AI ADVICE: play {playCard.color.value} {playCard.value.value}\n")
+        Trace.report(False, "\n\n AI player's turn...\n***** AI ADVICE: play %s %d\n", playCard.color.value, playCard.value.value)
         prevAmount = len(self.cards)
         for card in self.cards:
             if card.color == playCard.color and card.value == playCard.value:
                 self.cards.remove(card)
                 break
         assert len(self.cards) == prevAmount - 1
+        game.history.append(playCard)
         self.flight.addCard(playCard, game.ante, self, False, prev)
         if playCard.value.value <= prev.value:
             playCard.power(self, game)
@@ -68,9 +82,9 @@ class AIPlayer:
             self.gold -= payment
             self.cards += cards
         initLen = len(self.cards)
-        print(f"Looking for {chosen.color} {chosen.value}")
+        Trace.log(Trace.Level.Step, "Looking for %s %s", chosen.color, chosen.value)
         for card in self.cards:
-            print(f"Card {card.color} {card.value}")
+            Trace.log(Trace.Level.Step, "Card %s %s", card.color, card.value)
             if card.value == chosen.value and card.color == chosen.color:
                 self.cards.remove(card)
                 break
@@ -81,37 +95,30 @@ class AIPlayer:
         return chosen
     
     def decideCard(self, game: "TDA", value: Value, above: bool, isSim: bool = False):
-        options = []
-        if not isSim:
-            decisionMCTS = MCTS(100000, 10)
-            self.gold -= 5
-            res2 = decisionMCTS.search(game)
-            self.gold += 5
-        for card in self.cards:
-            if (card.value.value > value.value and above and card.good) or (card.value.value < value.value and not above and not card.good):
-                if isSim:
-                    options.append((card, 13-card.value.value))
-                else:
-                    self.cards.remove(card)
-                    res1 = decisionMCTS.search(game)
-                    self.cards.append(card)
-                    if res1[1] > res2[1]:
-                        options.append((card, res1[1]))
-        if options:
-            options.sort(key=lambda x: x[1], reverse=True)
-            chosen = options[0][0]
+        """Gives a card if one qualifies and beats paying 5 gold, all options share one search budget."""
+        eligible = [card for card in self.cards if (card.value.value > value.value and above and card.good) or (card.value.value < value.value and not above and not card.good)]
+        chosen = None
+        if eligible and isSim:
+            chosen = max(eligible, key=lambda card: 13-card.value.value)
+        elif eligible:
+            coins = game.clone()
+            coins.AIPlayer.gold -= 5
+            candidates = [(None, coins)]
+            for card in dict.fromkeys(eligible):
+                candidate = game.clone()
+                candidate.AIPlayer.cards.remove(card)
+                candidates.append((card, candidate))
+            (chosen, score) = MCTS(100000, self.decisionTime, self.MCTS.workers).race(candidates)
+        if chosen:
             self.cards.remove(chosen)
-            print(f"**** AI ADVICE: give card {chosen.color.value} {chosen.value.value}")
+            Trace.report(isSim, "**** AI ADVICE: give card %s %d", chosen.color.value, chosen.value.value)
 
             if len(self.cards) == 0:
-                if not isSim:
-                    (payment, cards) = game.buyCards(4, False, True)
-                else:
-                    (payment, cards) = game.buyCards(4, True)
+                (payment, cards) = game.buyCards(4, isSim, True)
                 self.gold -= payment
                 self.cards += cards
             
             return chosen
-        print("**** AI ADVICE: give coins, not card")
+        Trace.report(isSim, "**** AI ADVICE: give coins, not card")
         self.gold -= 5
         return None
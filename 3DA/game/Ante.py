@@ -2,7 +2,16 @@ from typing import List
 from .Card import Card
 
 class Ante:
+    __slots__ = ("cards", "anteValue", "value")
+
     def __init__(self, cards: List[Card]):
         self.cards = cards
         self.anteValue = max(cards, key=lambda card:card.value.value).value.value
-        self.value = self.anteValue*len(cards)
\ No newline at end of file
+        self.value = self.anteValue*len(cards)
+
+    def clone(self) -> "Ante":
+        other = Ante.__new__(Ante)
+        other.cards = self.cards.copy()
+        other.anteValue = self.anteValue
+        other.value = self.value
+        return other
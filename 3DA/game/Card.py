@@ -1,5 +1,6 @@
 from enum import Enum
 from abc import ABC, abstractmethod
+import random
 
 class Color(Enum):
     Gold = "Gold"
@@ -28,12 +29,36 @@ class Value(Enum):
     Twelve = 12
     Thirteen = 13
 
+COLOR_INDEX = {color: i for i, color in enumerate(Color)}
+
+# Fixed random 64 bit key per card code, a multiset of cards hashes to the sum of its keys
+_zobristRng = random.Random(3)
+ZOBRIST = [_zobristRng.getrandbits(64) for _ in range(len(Color)*len(Value))]
+
 class Card(ABC):
-    def __init__(self, color: Color, value: Value):
-        self.color = color
-        self.value = value
-        self.good = None
-        self.coinValue = 2 + (value.value/3.6)
+    """Cards are interned: GoldCard(Value(5)) always returns the same immutable instance, so cards
+    compare and hash by identity, can be shared between game states and map to a code in 0..129."""
+    __slots__ = ("value", "coinValue", "code", "zobrist")
+    color: Color = None # set by each subclass
+    good: bool = None
+    _interned = {}
+
+    def __new__(cls, value: Value):
+        card = Card._interned.get((cls, value))
+        if card is None:
+            card = super().__new__(cls)
+            object.__setattr__(card, "value", value)
+            object.__setattr__(card, "coinValue", 2 + (value.value/3.6))
+            object.__setattr__(card, "code", COLOR_INDEX[cls.color]*13 + value.value - 1)
+            object.__setattr__(card, "zobrist", ZOBRIST[card.code])
+            Card._interned[(cls, value)] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Cards are immutable")
+
+    def __reduce__(self):
+        return (self.__class__, (self.value,))
     
     @abstractmethod
     def power(self, player):
@@ -1,100 +1,69 @@
-from typing import Union
+from typing import List, Union
 from .Card import *
 from .TDA import TDA
 from .Player import Player
 from .AIPlayer import AIPlayer
+import game.Trace as Trace
+import game.Deciders as Deciders
 import random
 
 def randomCard(inputValue: Value = Value(6)) -> Card:
-    color = random.choice(list(Color))
-    return COLOR_TO_CLASS[color](inputValue)
+    return ALL_CARDS[random.randrange(len(Color))*13 + inputValue.value - 1]
+
+def cardFor(color: Color, value: Value) -> Card:
+    return ALL_CARDS[COLOR_INDEX[color]*13 + value.value - 1]
 
 # Subclasses for each color
 class GoldCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Gold, value)
-        self.good = True
+    __slots__ = ()
+    color = Color.Gold
+    good = True
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
-        print(f"Receiving {player.flight.goods} cards")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
+        Trace.report(isSim, "Receiving %d cards", player.flight.goods)
         if isinstance(player, Player):
             player.cardCount += player.flight.goods
         else:
-            cardsReceived = player.flight.goods
-            for _ in range(cardsReceived):
-                if not isSim:
-                    cardInput = input("Enter a card to add to AI player's hand:\n")
-                    try:
-                        colorInput, valueInput = cardInput.split(" ")
-                        color = Color(colorInput.capitalize())
-                        value = Value(int(valueInput))
-                        newCard = COLOR_TO_CLASS[color](value)
-                        player.cards.append(newCard)
-                    except Exception:
-                        print("Invalid input, try again\n")
-                else:
-                    player.cards.append(randomCard(Value(6)))
+            decider = Deciders.get(isSim)
+            for _ in range(player.flight.goods):
+                player.cards.append(decider.drawCard("Enter a card to add to AI player's hand:\n"))
 
 class SilverCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Silver, value)
-        self.good = True
+    __slots__ = ()
+    color = Color.Silver
+    good = True
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
         for p in game.players:
             if p.flight.goods > 0:
                 p.cardCount += 1
         if game.AIPlayer.flight.goods > 0:
-            if not isSim:
-                while True:
-                    cardInput = input("Enter a card to add to AI player's hand:\n")
-                    try:
-                        colorInput, valueInput = cardInput.split(" ")
-                        color = Color(colorInput.capitalize())
-                        value = Value(int(valueInput))
-                        newCard = COLOR_TO_CLASS[color](value)
-                        game.AIPlayer.cards.append(newCard)
-                        break
-                    except Exception:
-                        print("Invalid input, try again\n")
-            else:
-                game.AIPlayer.cards.append(randomCard(Value(6)))
+            game.AIPlayer.cards.append(Deciders.get(isSim).drawCard("Enter a card to add to AI player's hand:\n"))
 
 class CopperCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Copper, value)
-        self.good = True
+    __slots__ = ()
+    color = Color.Copper
+    good = True
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
-        if not isSim:
-            while True:
-                cardInput = input("Enter the card that is drawn from the deck:\n")
-                try:
-                    colorInput, valueInput = cardInput.split(" ")
-                    color = Color(colorInput.capitalize())
-                    value = Value(int(valueInput))
-                    newCard: Card = COLOR_TO_CLASS[color](value)
-                    break
-                except Exception:
-                    print("Invalid input, try again\n")
-        else:
-            newCard = COLOR_TO_CLASS[random.choice(list(Color))](Value(6))
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
+        newCard: Card = Deciders.get(isSim).drawCard("Enter the card that is drawn from the deck:\n")
         player.flight.cards.pop(-1)
         player.flight.total -= self.value.value
         player.flight.goods -= 1
+        player.flight.zobrist -= self.zobrist
         player.flight.addCard(newCard, game.ante, player, isSim)
         newCard.power(player, game, isSim)
 
 class BronzeCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Bronze, value)
-        self.good = True
+    __slots__ = ()
+    color = Color.Bronze
+    good = True
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
         anteCards = game.ante.cards
         anteCards.sort(key=lambda card: card.value.value)
         cards = 0
@@ -108,12 +77,12 @@ class BronzeCard(Card):
             player.cards.extend(drawnCards)
 
 class BrassCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Brass, value)
-        self.good = True
+    __slots__ = ()
+    color = Color.Brass
+    good = True
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
         toAI = False
         if isinstance(player, AIPlayer):
             idx = -1
@@ -133,11 +102,7 @@ class BrassCard(Card):
                 return
             else:
                 idx -= 1
-        if not isSim:
-            (gives, card) = card_coin_choice(game.players[idx], game, self.value, True, toAI)
-        else:
-            gives = random.choice([True, False])
-            card = randomCard(Value(max(self.value.value//2, 1)))
+        (gives, card) = card_coin_choice(game.players[idx], game, self.value, True, toAI, isSim)
         if gives:
             if isinstance(player, Player):
                 player.cardCount += 1
@@ -147,12 +112,13 @@ class BrassCard(Card):
             player.gold += 5
 
 class RedCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Red, value)
-        self.good = False
+    __slots__ = ()
+    color = Color.Red
+    good = False
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
+        decider = Deciders.get(isSim)
         highest = -1
         biggest = []
         for i, opp in enumerate(game.players):
@@ -169,51 +135,22 @@ class RedCard(Card):
             elif game.AIPlayer.flight.total == highest:
                 biggest.append(game.numPlayers - 1)
         if len(biggest) > 1:
-            if not isSim:
-                while True:
-                    try:
-                        selectedOpp = int(input(f"Player must select which opponent to draw from\noptions: {biggest}"))
-                        break
-                    except:
-                        print("Invalid input, enter an integer")
-            else:
-                selectedOpp = random.choice(biggest)
+            selectedOpp = decider.chooseOpponent(biggest)
         else:
             selectedOpp = biggest[0]
         if selectedOpp < game.numPlayers - 1:
             game.players[selectedOpp].gold -= 1
             game.players[selectedOpp].cardCount -= 1
             if game.players[selectedOpp].cardCount == 0:
-                if isSim:
-                    (payment, cards) = game.buyCards(4, True)
-                else:
-                    (payment, cards) = game.buyCards(4)
+                (payment, cards) = game.buyCards(4, isSim)
                 game.players[selectedOpp].gold -= payment
                 game.players[selectedOpp].cardCount += len(cards)
         else:
             game.AIPlayer.gold -= 1
-            print("Drawing from AI...")
-            if not isSim:
-                while True:
-                    cardInput = input("Enter the card drawn from AI player's hand:\n")
-                    try:
-                        colorInput, valueInput = cardInput.split(" ")
-                        color = Color(colorInput.capitalize())
-                        value = Value(int(valueInput))
-                        cardToRemove = next(card for card in game.AIPlayer.cards if card.color == color and card.value == value)
-                        game.AIPlayer.cards.remove(cardToRemove)
-                        break
-                    except StopIteration:
-                        print("Card not found in AI player's hand, try again\n")
-                    except Exception:
-                        print("Invalid input, try again\n")
-            else:
-                game.AIPlayer.cards.remove(random.choice(game.AIPlayer.cards))
+            Trace.report(isSim, "Drawing from AI...")
+            game.AIPlayer.cards.remove(decider.stolenCard(game.AIPlayer))
             if len(game.AIPlayer.cards) == 0:
-                if isSim:
-                    (payment, cards) = game.buyCards(4, True)
-                else:
-                    (payment, cards) = game.buyCards(4, False, True)
+                (payment, cards) = game.buyCards(4, isSim, True)
                 game.AIPlayer.gold -= payment
                 game.AIPlayer.cards += cards
 
@@ -221,38 +158,26 @@ class RedCard(Card):
         if isinstance(player, Player):
             player.cardCount += 1
         else:
-            if not isSim:
-                while True:
-                    cardInput = input("Enter the card added to the AI player's hand:\n")
-                    try:
-                        colorInput, valueInput = cardInput.split(" ")
-                        color = Color(colorInput.capitalize())
-                        value = Value(int(valueInput))
-                        player.cards.append(COLOR_TO_CLASS[color](value))
-                        break
-                    except:
-                        print("Invalid input, try again\n")
-            else:
-                player.cards.append(randomCard())
+            player.cards.append(decider.drawCard("Enter the card added to the AI player's hand:\n"))
 
 class BlackCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Black, value)
-        self.good = False
+    __slots__ = ()
+    color = Color.Black
+    good = False
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
         amount = min(3, game.ante.value)
         game.ante.value -= amount
         player.gold += amount
 
 class GreenCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Green, value)
-        self.good = False
+    __slots__ = ()
+    color = Color.Green
+    good = False
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
         toAI = False
         if isinstance(player, AIPlayer):
             idx = 0
@@ -272,11 +197,7 @@ class GreenCard(Card):
                 return
             else:
                 idx += 1
-        if not isSim:
-            (gives, card) = card_coin_choice(game.players[idx], game, self.value, False, toAI)
-        else:
-            gives = random.choice([True, False])
-            card = randomCard(Value(max(self.value.value//2, 1)))
+        (gives, card) = card_coin_choice(game.players[idx], game, self.value, False, toAI, isSim)
         if gives:
             if isinstance(player, Player):
                 player.cardCount += 1
@@ -286,12 +207,12 @@ class GreenCard(Card):
             player.gold += 5
 
 class WhiteCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.White, value)
-        self.good = False
+    __slots__ = ()
+    color = Color.White
+    good = False
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
         weakest = float('inf')
         weakest_opponents = []
         for i, opp in enumerate(game.players):
@@ -308,15 +229,7 @@ class WhiteCard(Card):
             elif game.AIPlayer.flight.total == weakest:
                 weakest_opponents.append(game.numPlayers - 1)
         if len(weakest_opponents) > 1:
-            if not isSim:
-                while True:
-                    try:
-                        selectedOpp = int(input(f"Player must select which opponent to draw from\noptions: {weakest_opponents}"))
-                        break
-                    except:
-                        print("Invalid input, enter an integer")
-            else:
-                selectedOpp = random.choice(weakest_opponents)
+            selectedOpp = Deciders.get(isSim).chooseOpponent(weakest_opponents)
         else:
             selectedOpp = weakest_opponents[0]
         if selectedOpp < game.numPlayers - 1:
@@ -327,24 +240,13 @@ class WhiteCard(Card):
         player.gold += 2
 
 class BlueCard(Card):
-    def __init__(self, value: Value):
-        super().__init__(Color.Blue, value)
-        self.good = False
+    __slots__ = ()
+    color = Color.Blue
+    good = False
     
     def power(self, player: Union["Player", "AIPlayer"], game: TDA, isSim : bool = False):
-        print(f"{self.color} {self.value.value} dragon triggers...")
-        if not isSim:
-            while True:
-                addAnteInput = input("Option: Enter 'Y' if you would like to add money to the stakes, and 'N' if you'd like 1 from each opponent\n")
-                if addAnteInput.capitalize() == 'Y':
-                    addAnte = True
-                elif addAnteInput.capitalize() == 'N':
-                    addAnte = False
-                else:
-                    continue
-                break
-        else:
-            addAnte = random.choice([True, False])
+        Trace.report(isSim, "%s %d dragon triggers...", self.color, self.value.value)
+        addAnte = Deciders.get(isSim).bluePaysAnte(player)
         if addAnte:
             amount = len(player.flight.cards)
             for opp in game.players:
@@ -375,35 +277,20 @@ COLOR_TO_CLASS: Card = {
     Color.Blue: BlueCard,
 }
 
-def card_coin_choice(receiver: Union[Player, AIPlayer], game:TDA, value: Value, above: bool, toAI: bool):
-    if isinstance(receiver, AIPlayer):
-        return receiver.decideCard(game, value, above, False)
+# One shared instance of every card, ALL_CARDS[card.code] is card
+ALL_CARDS: List[Card] = [COLOR_TO_CLASS[color](value) for color in Color for value in Value]
+
+def card_coin_choice(giver: Union[Player, AIPlayer], game: TDA, value: Value, above: bool, toAI: bool, isSim: bool = False):
+    if isinstance(giver, AIPlayer):
+        card = giver.decideCard(game, value, above, isSim)
+        return (card is not None, card)
+    (gives, card) = Deciders.get(isSim).giveCard(giver, value, above, toAI)
+    if gives:
+        giver.cardCount -= 1
+        if giver.cardCount == 0:
+            (payment, cards) = game.buyCards(4, isSim)
+            giver.gold -= payment
+            giver.cardCount += len(cards)
     else:
-        choice = input("Would you like to give a card? (Y/N)\n").strip().upper()
-        if choice == 'Y':
-            if toAI:
-                while True:
-                    cardInput = input("Enter the card to give:\n")
-                    try:
-                        colorInput, valueInput = cardInput.split(" ")
-                        color = Color(colorInput.capitalize())
-                        value = Value(int(valueInput))
-                        cardToGive = COLOR_TO_CLASS[color](value)
-                        receiver.cardCount -= 1
-                        if receiver.cardCount == 0:
-                            (payment, cards) = game.buyCards(4)
-                            receiver.gold -= payment
-                            receiver.cardCount += len(cards)
-                        return (True, cardToGive)
-                    except Exception:
-                        print("Invalid input, try again\n")
-            else:
-                receiver.cardCount -= 1
-                if receiver.cardCount == 0:
-                    (payment, cards) = game.buyCards(4)
-                    receiver.gold -= payment
-                    receiver.cardCount += len(cards)
-                return (True, None)
-        else:
-            receiver.gold -= 5
-            return (False, None)
+        giver.gold -= 5
+    return (gives, card)
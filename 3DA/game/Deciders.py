@@ -0,0 +1,229 @@
+from abc import ABC, abstractmethod
+from typing import List, Tuple, Union, TYPE_CHECKING
+from .Card import *
+import game.Cards as Cards
+import random
+
+if TYPE_CHECKING:
+    from .Ante import Ante
+    from .Player import Player
+    from .AIPlayer import AIPlayer
+
+
+def parseCard(cardInput: str) -> Card:
+    """Parses the standard "Color Value" format, raises on anything else."""
+    [colorInput, valueInput] = cardInput.split(" ")
+    color = Color(colorInput.capitalize())
+    value = Value(int(valueInput))
+    return Cards.cardFor(color, value)
+
+
+class Decider(ABC):
+    """Supplies everything the rules can't work out themselves: cards that are drawn or played
+    by people at the table, and the choices opponents make. The rules only ask, they never prompt."""
+
+    @abstractmethod
+    def drawCard(self, prompt: str, value: Value = Value(6)) -> Card:
+        """A card that comes off the deck (into the AI's hand, or a Copper replacement).
+        value is the guess used when the card isn't known."""
+
+    @abstractmethod
+    def playedCard(self, player: "Player", prev: Value) -> Card:
+        pass
+
+    @abstractmethod
+    def anteCard(self, player: "Player", idx: int) -> Card:
+        pass
+
+    @abstractmethod
+    def stolenCard(self, ai: "AIPlayer") -> Card:
+        """Which card an opponent draws from the AI's hand, must be one of ai.cards."""
+
+    @abstractmethod
+    def chooseOpponent(self, options: List[int]) -> int:
+        pass
+
+    @abstractmethod
+    def bluePaysAnte(self, player: Union["Player", "AIPlayer"]) -> bool:
+        """True to raise the stakes, False to take 1 gold from each opponent."""
+
+    @abstractmethod
+    def giveCard(self, giver: "Player", value: Value, above: bool, toAI: bool) -> Tuple[bool, Card]:
+        """Whether the giver hands over a card instead of 5 gold, and the card if the AI receives it."""
+
+    @abstractmethod
+    def anteCardsTaken(self, ante: "Ante", num: int) -> List[Card]:
+        pass
+
+    @abstractmethod
+    def purchase(self, num: int, isAI: bool) -> Tuple[int, List[Card]]:
+        pass
+
+    def confirmSearch(self) -> bool:
+        return True
+
+
+class ConsoleDecider(Decider):
+    """A human at the table types in every card and choice."""
+
+    def readCard(self, prompt: str) -> Card:
+        while True:
+            cardInput = input(prompt)
+            try:
+                return parseCard(cardInput)
+            except Exception:
+                print("Invalid input, try again\n")
+
+    def drawCard(self, prompt: str, value: Value = Value(6)) -> Card:
+        return self.readCard(prompt)
+
+    def playedCard(self, player: "Player", prev: Value) -> Card:
+        while True:
+            cardInput = input("please enter the card they played\n")
+            try:
+                return parseCard(cardInput)
+            except Exception as e:
+                print(f"Invalid input, try again\nError: {e}")
+
+    def anteCard(self, player: "Player", idx: int) -> Card:
+        while True:
+            cardInput = input(f"Please enter player {idx} ante card in standard format (\"Color Value\")\n")
+            try:
+                return parseCard(cardInput)
+            except Exception as e:
+                print(f"Invalid input, try again\nexception: {e}")
+
+    def stolenCard(self, ai: "AIPlayer") -> Card:
+        while True:
+            cardInput = input("Enter the card drawn from AI player's hand:\n")
+            try:
+                colorInput, valueInput = cardInput.split(" ")
+                color = Color(colorInput.capitalize())
+                value = Value(int(valueInput))
+                return next(card for card in ai.cards if card.color == color and card.value == value)
+            except StopIteration:
+                print("Card not found in AI player's hand, try again\n")
+            except Exception:
+                print("Invalid input, try again\n")
+
+    def chooseOpponent(self, options: List[int]) -> int:
+        while True:
+            try:
+                return int(input(f"Player must select which opponent to draw from\noptions: {options}"))
+            except:
+                print("Invalid input, enter an integer")
+
+    def bluePaysAnte(self, player: Union["Player", "AIPlayer"]) -> bool:
+        while True:
+            addAnteInput = input("Option: Enter 'Y' if you would like to add money to the stakes, and 'N' if you'd like 1 from each opponent\n")
+            if addAnteInput.capitalize() == 'Y':
+                return True
+            elif addAnteInput.capitalize() == 'N':
+                return False
+
+    def giveCard(self, giver: "Player", value: Value, above: bool, toAI: bool) -> Tuple[bool, Card]:
+        choice = input("Would you like to give a card? (Y/N)\n").strip().upper()
+        if choice != 'Y':
+            return (False, None)
+        if toAI:
+            return (True, self.readCard("Enter the card to give:\n"))
+        return (True, None)
+
+    def anteCardsTaken(self, ante: "Ante", num: int) -> List[Card]:
+        remaining = ante.cards.copy()
+        taken = []
+        for _ in range(num):
+            while True:
+                card_input = input("Enter a card to remove from ante (format: Color Value):\n")
+                try:
+                    color_input, value_input = card_input.split(" ")
+                    color = Color(color_input.capitalize())
+                    value = Value(int(value_input))
+                    card_to_remove = next((c for c in remaining if c.color == color and c.value == value), None)
+                    if card_to_remove:
+                        remaining.remove(card_to_remove)
+                        taken.append(card_to_remove)
+                        break
+                    else:
+                        print("Card not found in ante. Try again.")
+                except Exception as e:
+                    print(f"Invalid input, try again. Exception: {e}")
+        return taken
+
+    def purchase(self, num: int, isAI: bool) -> Tuple[int, List[Card]]:
+        while True:
+            try:
+                payment = int(input("Need to BUY. Enter how much to buy for: "))
+                if 1 <= payment <= 13:
+                    break
+                else:
+                    print("Please enter a valid number between 1 and 13.")
+            except ValueError:
+                print("Invalid input. Please enter an integer.")
+        cards = []
+        if isAI:
+            for _ in range(num):
+                while True:
+                    try:
+                        cards.append(parseCard(input("Enter card color and value: ")))
+                        break
+                    except Exception as e:
+                        print(f"Invalid input. Error: {e}")
+        return (payment, cards)
+
+    def confirmSearch(self) -> bool:
+        while True:
+            user = input("Simulate AI turn? (y)\n")
+            if user == "y":
+                return True
+            print("Invalid input, try again")
+
+
+class RandomDecider(Decider):
+    """Random policy used by the simulations: opponents play from their Bayesian model and
+    every other choice is a coin flip. Also lets a whole game run headless."""
+
+    def drawCard(self, prompt: str, value: Value = Value(6)) -> Card:
+        return Cards.randomCard(value)
+
+    def playedCard(self, player: "Player", prev: Value) -> Card:
+        return player.determineNext()
+
+    def anteCard(self, player: "Player", idx: int) -> Card:
+        return player.determineAnte()
+
+    def stolenCard(self, ai: "AIPlayer") -> Card:
+        return random.choice(ai.cards)
+
+    def chooseOpponent(self, options: List[int]) -> int:
+        return random.choice(options)
+
+    def bluePaysAnte(self, player: Union["Player", "AIPlayer"]) -> bool:
+        return random.choice([True, False])
+
+    def giveCard(self, giver: "Player", value: Value, above: bool, toAI: bool) -> Tuple[bool, Card]:
+        return (random.choice([True, False]), Cards.randomCard(Value(max(value.value//2, 1))))
+
+    def anteCardsTaken(self, ante: "Ante", num: int) -> List[Card]:
+        return sorted(ante.cards, key=lambda c: c.value.value, reverse=True)[:num]
+
+    def purchase(self, num: int, isAI: bool) -> Tuple[int, List[Card]]:
+        payment = random.randint(1, 13)
+        cards = [Cards.randomCard(Value(random.randint(1, 13))) for _ in range(num)]
+        return (payment, cards)
+
+
+# The decider for the real game and the one used inside simulations.
+# Swap them with use(), e.g. use(RandomDecider()) to play a full game headless.
+table: Decider = ConsoleDecider()
+sim: Decider = RandomDecider()
+
+def get(isSim: bool = False) -> Decider:
+    return sim if isSim else table
+
+def use(tableDecider: Decider = None, simDecider: Decider = None):
+    global table, sim
+    if tableDecider is not None:
+        table = tableDecider
+    if simDecider is not None:
+        sim = simDecider
@@ -3,19 +3,33 @@ from .Card import *
 from .Ante import Ante
 import game.Player as Player
 import game.AIPlayer as AIPlayer
-from collections import defaultdict
+import game.Deciders as Deciders
 
 class Flight:
+    __slots__ = ("cards", "total", "goods", "evils", "value_count", "zobrist")
+
     def __init__(self):
         self.cards: List[Card] = []
         self.total = 0
         self.goods = 0
         self.evils = 0
-        self.value_count = defaultdict(int)
+        self.value_count: List[int] = [0]*14  # indexed by card value
+        self.zobrist = 0 # sum of the cards' keys, independent of play order
+
+    def clone(self) -> "Flight":
+        other = Flight.__new__(Flight)
+        other.cards = self.cards.copy()
+        other.total = self.total
+        other.goods = self.goods
+        other.evils = self.evils
+        other.value_count = self.value_count.copy()
+        other.zobrist = self.zobrist
+        return other
     
     def addCard(self, card: Card, ante: Ante, player: Union[Player.Player, AIPlayer.AIPlayer], isSim: bool = False, prev: Value = Value(13)):
         self.cards.append(card)
         self.total += card.value.value
+        self.zobrist += card.zobrist
         if card.good:
             self.goods += 1
         else:
@@ -28,28 +42,9 @@ class Flight:
             ante.value -= min(goldToAdd, ante.value)
         
             cardsToAdd = min(2, len(ante.cards))
-            removed_cards = []
-            if not isSim:
-                for _ in range(cardsToAdd):
-                    while True:
-                        card_input = input("Enter a card to remove from ante (format: Color Value):\n")
-                        try:
-                            color_input, value_input = card_input.split(" ")
-                            color = Color(color_input.capitalize())
-                            value = Value(int(value_input))
-                            card_to_remove = next((c for c in ante.cards if c.color == color and c.value == value), None)
-                            if card_to_remove:
-                                ante.cards.remove(card_to_remove)
-                                removed_cards.append(card_to_remove)
-                                break
-                            else:
-                                print("Card not found in ante. Try again.")
-                        except Exception as e:
-                            print(f"Invalid input, try again. Exception: {e}")
-            else:
-                ante.cards.sort(key=lambda c: c.value.value, reverse=True)
-                removed_cards = ante.cards[:cardsToAdd]
-                ante.cards = ante.cards[cardsToAdd:]
+            removed_cards = Deciders.get(isSim).anteCardsTaken(ante, cardsToAdd)
+            for removed in removed_cards:
+                ante.cards.remove(removed)
             if isinstance(player, AIPlayer.AIPlayer):    
                 player.cards += removed_cards
             else:
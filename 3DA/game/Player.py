@@ -1,6 +1,7 @@
 import game.Flight as Flight
 from .Card import *
 import game.Cards as Cards
+import game.Deciders as Deciders
 from typing import TYPE_CHECKING
 import random
 import math
@@ -10,6 +11,8 @@ if TYPE_CHECKING:
 
 
 class Player:
+    __slots__ = ("gold", "cardCount", "flight", "NumToProb", "AnteNumToProb")
+
     def __init__(self, gold: int, cardCount: int=6):
         self.gold = gold
         self.cardCount = cardCount
@@ -45,29 +48,32 @@ class Player:
             13: 0.0150
         }
 
+    def clone(self) -> "Player":
+        # AnteNumToProb is never updated, so copies can share it
+        other = Player.__new__(Player)
+        other.gold = self.gold
+        other.cardCount = self.cardCount
+        other.flight = self.flight.clone()
+        other.NumToProb = self.NumToProb.copy()
+        other.AnteNumToProb = self.AnteNumToProb
+        return other
     
     def playTurn(self, prev: Value, game: "TDA") -> Card:
         if self.cardCount <= 1:
             (payment, cards) = game.buyCards()
             self.gold -= payment
             self.cardCount += len(cards)
-        while True:
-            cardInput = input("please enter the card they played\n")
-            try:
-                [colorInput, valueInput] = cardInput.split(" ")
-                color = Color(colorInput.capitalize())
-                value = Value(int(valueInput))
-                thisCard: Card = Cards.COLOR_TO_CLASS[color](value)
-                self.cardCount -= 1
-                self.flight.addCard(thisCard, game.ante, self, False, prev)
-                self.bayesianUpdate()
-                if thisCard.value.value <= prev.value:
-                    thisCard.power(self, game)
-                return self.flight.cards[-1]
-            except Exception as e:
-                print(f"Invalid input, try again\nError: {e}")
+        thisCard: Card = Deciders.get().playedCard(self, prev)
+        game.history.append(thisCard)
+        self.cardCount -= 1
+        self.flight.addCard(thisCard, game.ante, self, False, prev)
+        self.bayesianUpdate()
+        if thisCard.value.value <= prev.value:
+            thisCard.power(self, game)
+        return self.flight.cards[-1]
     
-    def simTurn(self, prev: Value, game: "TDA") -> Card:
+    def simTurn(self, prev: Value, game: "TDA", card: Card = None) -> Card:
+        """Plays card, or one drawn from the opponent model when it is None."""
         if self.cardCount <= 1:
             (payment, cards) = game.buyCards((4-self.cardCount), True)
             self.gold -= payment
@@ -75,7 +81,7 @@ class Player:
         if not game.ante:
             nextCard = self.determineAnte()
         else:
-            nextCard = self.determineNext()
+            nextCard = card or self.determineNext()
             self.flight.addCard(nextCard, game.ante, self, True, prev)
             if nextCard.value.value <= prev.value:
                 nextCard.power(self, game, True)
@@ -84,18 +90,15 @@ class Player:
 
     def determineNext(self) -> Card:
         predictedVal = random.choices(list(self.NumToProb.keys()), weights=self.NumToProb.values(), k=1)[0]
-        predictedColorClass = random.choice(list(Cards.COLOR_TO_CLASS.values()))
-        predictedCard = predictedColorClass(Value(predictedVal))
-        return predictedCard
+        return Cards.randomCard(Value(predictedVal))
 
     def determineAnte(self) -> Card:
         predictedVal = random.choices(list(self.AnteNumToProb.keys()), weights=self.AnteNumToProb.values(), k=1)[0]
-        predictedColorClass = random.choice(list(Cards.COLOR_TO_CLASS.values()))
-        predictedCard = predictedColorClass(Value(predictedVal))
-        return predictedCard
+        return Cards.randomCard(Value(predictedVal))
 
     def bayesianUpdate(self):
-        stdDev = 3.5 - (len(self.flight.cards)*.5)
+        # long flights (only reachable in full games) would otherwise shrink this to zero
+        stdDev = max(3.5 - (len(self.flight.cards)*.5), .5)
         posts = []
         for prev in self.NumToProb:
             prevProb = self.NumToProb[prev]
@@ -103,5 +106,7 @@ class Player:
             unnormPost = prevProb * likelihood
             posts.append(unnormPost)
         norm = sum(posts)
+        if norm == 0:
+            return
         for i in range(len(posts)):
             self.NumToProb[i+1] = posts[i]/norm
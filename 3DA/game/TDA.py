@@ -1,25 +1,50 @@
 from typing import List
 from .Card import *
-import game.Cards as Cards
 from .Ante import Ante
 from .Flight import Flight
 from .AIPlayer import AIPlayer
 from .Player import Player
+import game.Trace as Trace
+import game.Deciders as Deciders
 from collections import defaultdict
-import random
 
 class TDA:
-    def __init__(self, numPlayers: int, playerGold: int, AICards: List[Card]):
+    __slots__ = ("numPlayers", "players", "AIPlayer", "ante", "turn", "prev", "playerGold", "history")
+
+    def __init__(self, numPlayers: int, playerGold: int, AICards: List[Card], AIWorkers: int = 1):
         self.numPlayers = numPlayers
         self.players: List[Player]= []
         for _ in range(numPlayers-1):
             self.players.append(Player(playerGold*numPlayers))
-        self.AIPlayer = AIPlayer(playerGold*numPlayers, AICards)
+        self.AIPlayer = AIPlayer(playerGold*numPlayers, AICards, AIWorkers)
         self.ante: Ante = None
         self.turn: int = None
         self.prev = Value(13)
         self.playerGold = playerGold
+        self.history: List[Card] = [] # cards actually played this gambit, in order
+
+    def clone(self) -> "TDA":
+        """Cheap copy of the game state for simulations, cards are shared since they are never mutated."""
+        other = TDA.__new__(TDA)
+        other.numPlayers = self.numPlayers
+        other.players = [player.clone() for player in self.players]
+        other.AIPlayer = self.AIPlayer.clone()
+        other.ante = self.ante.clone() if self.ante else None
+        other.turn = self.turn
+        other.prev = self.prev
+        other.playerGold = self.playerGold
+        other.history = self.history # only real turns append to it, simulations can share it
+        return other
     
+    def stateHash(self) -> int:
+        """Equal for states reached through different orders of the same plays (transpositions).
+        Flights are hashed incrementally as multisets, only the last card of each one is kept in order."""
+        seats = [(player.gold, player.cardCount, player.flight.zobrist, player.flight.cards[-1].code if player.flight.cards else -1) for player in self.players]
+        AI = self.AIPlayer
+        seats.append((AI.gold, sum(card.zobrist for card in AI.cards), AI.flight.zobrist, AI.flight.cards[-1].code if AI.flight.cards else -1))
+        ante = (self.ante.value, sum(card.zobrist for card in self.ante.cards)) if self.ante else None
+        return hash((self.turn, self.prev, ante, tuple(seats)))
+
     def isGameOver(self):
         return min(self.players, key=lambda player:player.gold).gold < 0
 
@@ -35,40 +60,37 @@ class TDA:
         sums.sort()
         return sums[-1] > sums[-2]
 
+    def playGame(self):
+        """Plays gambits until someone runs out of gold, with every outside input coming from the table decider."""
+        while not self.isGameOver():
+            self.playAnte()
+            round = 1
+            while not self.isGambitOver():
+                self.playRound(round)
+                round += 1
+            self.endGambit()
+            self.dealCards()
+
     def playAnte(self):
+        decider = Deciders.get()
         thisAnteCards: List[Card] = []
         AIAnte = self.AIPlayer.ante(self)
-        while len(thisAnteCards) < self.numPlayers - 1:
-            cardInput = input(f"Please enter player {len(thisAnteCards)} ante card in standard format (\"Color Value\")\n")
-            try:
-                [colorInput, valueInput] = cardInput.split(" ")
-                color = Color(colorInput.capitalize())
-                value = Value(int(valueInput))
-                thisAnteCards.append(Cards.COLOR_TO_CLASS[color](value))
-                self.players[len(thisAnteCards)-1].cardCount -= 1
-            except Exception as e:
-                print(f"Invalid input, try again\nexception: {e}")
+        for i, player in enumerate(self.players):
+            thisAnteCards.append(decider.anteCard(player, i))
+            player.cardCount -= 1
         
         thisAnteCards.append(AIAnte)
         startIdx = self.findStart(thisAnteCards)
         if startIdx == -1:
             for player in self.players:
                 player.cardCount += 1
-            print("The ante is a tie!!!")
-            while True:
-                newCard = input('Please enter the new card for AI\n')
-                try:
-                    [colorInput, valueInput] = newCard.split(" ")
-                    color = Color(colorInput.capitalize())
-                    value = Value(int(valueInput))
-                    self.AIPlayer.cards.append(Cards.COLOR_TO_CLASS[color](value))
-                    break
-                except:
-                    print("Invalid input, try again\n")
+            Trace.report(False, "The ante is a tie!!!")
+            self.AIPlayer.cards.append(decider.drawCard('Please enter the new card for AI\n'))
             self.playAnte()
             return
 
         self.ante = Ante(thisAnteCards)
+        self.history = []
 
         for player in self.players:
             player.gold -= self.ante.anteValue
@@ -77,7 +99,7 @@ class TDA:
 
         self.turn = startIdx
 
-        print("Ante completed successfully\n\n")
+        Trace.report(False, "Ante completed successfully\n\n")
     
     def findStart(self, cards: List[Card]):
         counts = defaultdict(int)
@@ -92,7 +114,7 @@ class TDA:
         return idx
 
     def playRound(self, roundNum: int):
-        print(f"Beginning round {roundNum}, starting with player {self.turn}")
+        Trace.report(False, "Beginning round %d, starting with player %d", roundNum, self.turn)
         turns = 0
         self.prev = Value(13)
         while turns < self.numPlayers:
@@ -107,19 +129,20 @@ class TDA:
     
     def playTurn(self) -> Card:
         if self.turn != self.numPlayers-1:
-            print(f"Player {self.turn} turn...")
+            Trace.report(False, "Player %d turn...", self.turn)
             newPrev = self.players[self.turn].playTurn(self.prev, self)
         else:
             newPrev = self.AIPlayer.playTurn(self, self.prev)
-        self.printStatus()
+        if Trace.shows(False):
+            self.printStatus()
         return newPrev
 
     def simTurn(self, choice: Card):
-        print(f"simulating turn for player {self.turn}...")
+        Trace.log(Trace.Level.Step, "simulating turn for player %d...", self.turn)
         if self.turn == self.numPlayers-1:
             used = self.AIPlayer.simTurn(self, self.prev, choice)
         else:
-            used = self.players[self.turn].simTurn(self.prev, self)
+            used = self.players[self.turn].simTurn(self.prev, self, choice)
         self.turn = (self.turn + 1)%self.numPlayers
         self.prev = used.value
         if all(len(player.flight.cards) > 0 for player in self.players) and len(self.AIPlayer.flight.cards) > 0:
@@ -158,15 +181,17 @@ class TDA:
             player.gold -= toRemove
         self.AIPlayer.gold -= toRemove
 
-    def endGambit(self):
+    def endGambit(self, isSim: bool = False):
         self.doColorFlights()
 
-        print()
-        flights = [player.flight.total for player in self.players]
-        print(f"Flights: {flights}")
-        aiflight = [(card.color.value, card.value.value) for card in self.AIPlayer.flight.cards]
-        print(f"AI flight: {aiflight}")
-        print(f"{self.AIPlayer.flight.total}")
+        show = Trace.shows(isSim)
+        if show:
+            print()
+            flights = [player.flight.total for player in self.players]
+            print(f"Flights: {flights}")
+            aiflight = [(card.color.value, card.value.value) for card in self.AIPlayer.flight.cards]
+            print(f"AI flight: {aiflight}")
+            print(f"{self.AIPlayer.flight.total}")
 
         winner = None
         highest = 0
@@ -177,8 +202,9 @@ class TDA:
             player.flight = Flight()
         if self.AIPlayer.flight.total > highest:
             winner = self.AIPlayer
-            print("AI won!!!")
-        else:
+            if show:
+                print("AI won!!!")
+        elif show:
             print("AI did not win...")
 
         self.AIPlayer.flight = Flight()
@@ -186,25 +212,16 @@ class TDA:
 
         self.ante = None
 
-        self.printStatus()
+        if show:
+            self.printStatus()
     
     def dealCards(self):
         for player in self.players:
             player.cardCount = min(10, player.cardCount + 2)
         AICards = min(2, 10-len(self.AIPlayer.cards))
+        decider = Deciders.get()
         for _ in range(AICards):
-            while True:
-                cardInput = input("Enter card dealt for new gambit to AI...\n")
-                try:
-                    [colorInput, valueInput] = cardInput.split(" ")
-                    color = Color(colorInput.capitalize())
-                    value = Value(int(valueInput))
-                    thisCard: Card = Cards.COLOR_TO_CLASS[color](value)
-                    self.AIPlayer.cards.append(thisCard)
-                    break
-                except Exception as e:
-                    print(e)
-                    print("Invalid input, try again\n")
+            self.AIPlayer.cards.append(decider.drawCard("Enter card dealt for new gambit to AI...\n"))
     
     def checkWinner(self):
         highest = 0
@@ -215,9 +232,9 @@ class TDA:
                 highest = player.gold
         
         if self.AIPlayer.gold >= highest:
-            print(f"AI won with {self.AIPlayer.gold} gold!!!")
+            Trace.report(False, "AI won with %d gold!!!", self.AIPlayer.gold)
         else:
-            print(f"Player {winner} won with {highest} gold")
+            Trace.report(False, "Player %d won with %d gold", winner, highest)
     
     def printStatus(self):
         print('\nPRINTING current game status...\n')
@@ -235,35 +252,6 @@ class TDA:
         return self.AIPlayer.gold + sum(card.coinValue for card in self.AIPlayer.cards)
     
     def buyCards(self, num: int = 3, isSim: bool = False, isAI: bool = False):
-        if not isSim:
-            while True:
-                try:
-                    payment = int(input("Need to BUY. Enter how much to buy for: "))
-                    if 1 <= payment <= 13:
-                        break
-                    else:
-                        print("Please enter a valid number between 1 and 13.")
-                except ValueError:
-                    print("Invalid input. Please enter an integer.")
-            cards = []
-            if isAI:
-                for _ in range(num):
-                    while True:
-                        try:
-                            cardInput = input("Enter card color and value: ").capitalize()
-                            [colorInput, valueInput] = cardInput.split(" ")
-                            color = Color(colorInput)
-                            value = Value(int(valueInput))
-                            cards.append(Cards.COLOR_TO_CLASS[color](value))
-                            break
-                        except Exception as e:
-                            print(f"Invalid input. Error: {e}")
-        else:
-            payment = random.randint(1, 13)
-            cards = []
-            for _ in range(num):
-                color = random.choice(list(Cards.COLOR_TO_CLASS.keys()))
-                value = random.randint(1, 13)
-                cards.append(Cards.COLOR_TO_CLASS[color](Value(value)))
+        (payment, cards) = Deciders.get(isSim).purchase(num, isAI)
         self.ante.value += payment
-        return (payment, cards)
\ No newline at end of file
+        return (payment, cards)
@@ -0,0 +1,39 @@
+from enum import IntEnum
+import os
+
+class Level(IntEnum):
+    Off = 0
+    Summary = 1     # one line per search / decision
+    Iteration = 2   # one line per MCTS iteration
+    Step = 3        # every selection, expansion and simulated turn
+
+# Module wide level, read on every call so it can be changed mid-game.
+# TDA_TRACE=Step (etc.) sets it from the environment.
+level = Level[os.environ.get("TDA_TRACE", "Off").capitalize()]
+
+# Whether the real game's progress is printed, on for the console game and off for headless runs
+gameOutput = True
+
+def setLevel(newLevel: Level):
+    global level
+    level = Level(newLevel)
+
+def setGameOutput(on: bool):
+    global gameOutput
+    gameOutput = on
+
+def enabled(at: Level) -> bool:
+    return level >= at
+
+def log(at: Level, msg: str, *args):
+    """Prints msg % args if tracing at this level, formatting is skipped otherwise."""
+    if level >= at:
+        print(msg % args if args else msg)
+
+def shows(isSim: bool) -> bool:
+    """Real game output is shown unless turned off, simulated output only when tracing every step."""
+    return (gameOutput and not isSim) or level >= Level.Step
+
+def report(isSim: bool, msg: str, *args):
+    if (gameOutput and not isSim) or level >= Level.Step:
+        print(msg % args if args else msg)
@@ -5,6 +5,16 @@ from game.Card import *
 from game.Player import Player
 from game.Ante import Ante
 from game.Flight import Flight
+import game.Trace as Trace
+import game.Deciders as Deciders
+from MCTS.MCTS import MCTS
+from MCTS.Transpositions import TranspositionTable
+import MCTS.BatchRollout as BatchRollout
+import random
+import time
+import pickle
+import io
+from contextlib import redirect_stdout
 
 class TestGoldCard(unittest.TestCase):
     def setUp(self):
@@ -75,9 +85,6 @@ class TestBronzeCard(unittest.TestCase):
         self.player = Player(10)
         self.player.cardCount = 2
         self.game.ante = Ante([GoldCard(Value(4)), RedCard(Value(3)), BlueCard(Value(2))])
-        self.game.ante.cards[0].value = Value(4)
-        self.game.ante.cards[1].value = Value(3)
-        self.game.ante.cards[2].value = Value(2)
 
     def test_bronze_card_power(self):
         card = BronzeCard(Value(3))
@@ -413,6 +420,294 @@ class TestPurchasing(unittest.TestCase):
         self.assertTrue(self.game.AIPlayer.gold < 30)
         self.assertEqual(len(self.game.AIPlayer.cards), 3)
 
+class TestClone(unittest.TestCase):
+    def setUp(self):
+        self.game = TDA(3, 10, [BlueCard(Value(5)), RedCard(Value(6)), BlueCard(Value(2)), RedCard(Value(4)), BronzeCard(Value(1)), GreenCard(Value(6))])
+        self.game.ante = Ante([GoldCard(Value(4)), RedCard(Value(3)), BlueCard(Value(2))])
+        self.game.turn = 2
+        self.game.players[0].flight.addCard(SilverCard(Value(3)), self.game.ante, self.game.players[0])
+
+    def test_clone_is_independent(self):
+        copy = self.game.clone()
+        copy.players[0].flight.addCard(SilverCard(Value(3)), copy.ante, copy.players[0])
+        copy.players[0].NumToProb[1] = 1
+        copy.AIPlayer.cards.pop()
+        copy.AIPlayer.gold -= 5
+        copy.ante.cards.pop()
+        copy.ante.value -= 3
+
+        self.assertEqual(len(self.game.players[0].flight.cards), 1)
+        self.assertEqual(self.game.players[0].flight.value_count[3], 1)
+        self.assertEqual(self.game.players[0].NumToProb[1], 0.03)
+        self.assertEqual(len(self.game.AIPlayer.cards), 6)
+        self.assertEqual(self.game.AIPlayer.gold, 30)
+        self.assertEqual(len(self.game.ante.cards), 3)
+        self.assertEqual(self.game.ante.value, 12)
+        self.assertIs(copy.AIPlayer.MCTS, self.game.AIPlayer.MCTS)
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.game = MagicMock()
+        self.player = Player(10)
+        self.game.ante = Ante([GoldCard(Value(4)), RedCard(Value(3)), BlueCard(Value(2))])
+        self.previous = Trace.level
+
+    def tearDown(self):
+        Trace.setLevel(self.previous)
+
+    def test_sim_power_is_silent(self):
+        Trace.setLevel(Trace.Level.Off)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            BlackCard(Value(3)).power(self.player, self.game, True)
+        self.assertEqual(out.getvalue(), "")
+
+    def test_step_trace_shows_sim_power(self):
+        Trace.setLevel(Trace.Level.Step)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            BlackCard(Value(3)).power(self.player, self.game, True)
+        self.assertIn("dragon triggers", out.getvalue())
+
+    def test_real_power_always_reported(self):
+        Trace.setLevel(Trace.Level.Off)
+        out = io.StringIO()
+        with redirect_stdout(out):
+            BlackCard(Value(3)).power(self.player, self.game)
+        self.assertIn("dragon triggers", out.getvalue())
+
+class TestHeadless(unittest.TestCase):
+    def setUp(self):
+        random.seed(3)
+        self.previous = (Deciders.table, Deciders.sim, Trace.gameOutput)
+        Deciders.use(Deciders.RandomDecider())
+        Trace.setGameOutput(False)
+
+    def tearDown(self):
+        Deciders.use(self.previous[0], self.previous[1])
+        Trace.setGameOutput(self.previous[2])
+
+    @patch("builtins.input", side_effect=AssertionError("headless game prompted for input"))
+    def test_player_turn_uses_decider(self, mock_input):
+        game = TDA(3, 10, [BlueCard(Value(5)), RedCard(Value(6)), BlueCard(Value(2))])
+        game.ante = Ante([GoldCard(Value(4)), RedCard(Value(3)), BlueCard(Value(2))])
+        played = game.players[0].playTurn(Value(13), game)
+        self.assertIs(game.players[0].flight.cards[-1], played)
+        self.assertEqual(game.players[0].cardCount, 5)
+
+    @patch("builtins.input", side_effect=AssertionError("headless game prompted for input"))
+    def test_full_game_runs_headless(self, mock_input):
+        with patch("game.AIPlayer.MCTS", lambda iters, time, *args, **kwargs: MCTS(10, time, *args, **kwargs)):
+            game = TDA(3, 5, [BlueCard(Value(5)), RedCard(Value(6)), BlueCard(Value(2)), RedCard(Value(4)), BronzeCard(Value(1)), GreenCard(Value(6))])
+            game.playGame()
+        self.assertTrue(game.isGameOver())
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self):
+        self.game = TDA(3, 10, [BlueCard(Value(5)), RedCard(Value(6)), BlueCard(Value(2))], AIWorkers=2)
+        self.game.ante = Ante([GoldCard(Value(4)), RedCard(Value(3)), BlueCard(Value(2))])
+        self.game.turn = 0
+
+    def test_root_parallel_merges_trees(self):
+        search = MCTS(30, 5, 2)
+        self.assertEqual(self.game.AIPlayer.MCTS.workers, 2)
+        stats = search.parallelStats(self.game)
+        self.assertEqual(sum(entry[2] for entry in stats.values()), 60)
+        (card, score) = search.search(self.game)
+        self.assertIn((card.color, card.value), [(c.color, c.value) for c in self.game.AIPlayer.cards])
+
+class TestCardIdentity(unittest.TestCase):
+    def test_cards_are_interned(self):
+        self.assertIs(GoldCard(Value(5)), GoldCard(Value(5)))
+        self.assertIsNot(GoldCard(Value(5)), SilverCard(Value(5)))
+        self.assertEqual(len({GoldCard(Value(5)), GoldCard(Value(5)), RedCard(Value(5))}), 2)
+
+    def test_card_codes(self):
+        self.assertEqual(len(ALL_CARDS), 130)
+        self.assertEqual([card.code for card in ALL_CARDS], list(range(130)))
+        self.assertIs(ALL_CARDS[BlueCard(Value(13)).code], BlueCard(Value(13)))
+        self.assertIs(cardFor(Color.Red, Value(3)), RedCard(Value(3)))
+
+    def test_cards_are_immutable(self):
+        with self.assertRaises(AttributeError):
+            GoldCard(Value(5)).value = Value(6)
+
+    def test_pickle_keeps_identity(self):
+        self.assertIs(pickle.loads(pickle.dumps(RedCard(Value(9)))), RedCard(Value(9)))
+
+class TestTranspositions(unittest.TestCase):
+    def makeGame(self, aiOrder):
+        game = TDA(3, 10, [BlueCard(Value(5)), RedCard(Value(6))])
+        game.ante = Ante([GoldCard(Value(4)), RedCard(Value(3)), BlueCard(Value(2))])
+        game.turn = 0
+        for card in aiOrder:
+            game.AIPlayer.flight.addCard(card, game.ante, game.AIPlayer)
+        return game
+
+    def test_move_order_transposes(self):
+        first = self.makeGame([GoldCard(Value(9)), SilverCard(Value(7)), RedCard(Value(12))])
+        second = self.makeGame([SilverCard(Value(7)), GoldCard(Value(9)), RedCard(Value(12))])
+        self.assertEqual(first.stateHash(), second.stateHash())
+        self.assertEqual(first.stateHash(), first.clone().stateHash())
+
+    def test_different_states_differ(self):
+        first = self.makeGame([GoldCard(Value(9)), SilverCard(Value(7)), RedCard(Value(12))])
+        lastDiffers = self.makeGame([GoldCard(Value(9)), RedCard(Value(12)), SilverCard(Value(7))])
+        goldDiffers = self.makeGame([GoldCard(Value(9)), SilverCard(Value(7)), RedCard(Value(12))])
+        goldDiffers.players[1].gold -= 1
+        self.assertNotEqual(first.stateHash(), lastDiffers.stateHash())
+        self.assertNotEqual(first.stateHash(), goldDiffers.stateHash())
+
+    def test_table_shares_and_evicts(self):
+        table = TranspositionTable(2)
+        shared = table.get(1)
+        self.assertIs(table.get(1), shared)
+        table.get(2)
+        table.get(1)
+        table.get(3)
+        self.assertEqual(len(table), 2)
+        self.assertIs(table.get(1), shared)
+        self.assertNotIn(2, table.entries)
+
+class TestTreeReuse(unittest.TestCase):
+    def setUp(self):
+        random.seed(5)
+        self.previous = Deciders.table
+        Deciders.use(Deciders.RandomDecider())
+        self.game = TDA(3, 10, [BlueCard(Value(5)), RedCard(Value(6)), SilverCard(Value(12)), GoldCard(Value(9))])
+        self.game.ante = Ante([GoldCard(Value(4)), RedCard(Value(3)), BlueCard(Value(2))])
+        self.game.turn = 2
+        self.search = MCTS(400, 10, reuse=True)
+        self.search.search(self.game)
+
+    def tearDown(self):
+        Deciders.use(self.previous)
+
+    def walkToNextAITurn(self):
+        node = self.search.root
+        moves = []
+        while True:
+            (card, node) = max(node.children.items(), key=lambda item: item[1].visits)
+            moves.append(card)
+            if node.isAI:
+                return (moves, node)
+
+    def test_reroots_on_observed_moves(self):
+        (moves, node) = self.walkToNextAITurn()
+        visits = node.visits
+        self.game.history.extend(moves)
+        state = node.state.clone()
+        state.history = self.game.history
+        self.assertIs(self.search.reroot(state), node)
+        self.assertIsNone(node.parent)
+        self.search.search(state)
+        self.assertIs(self.search.root, node)
+        self.assertGreater(node.visits, visits)
+
+    def test_unexpanded_move_starts_fresh(self):
+        (moves, node) = self.walkToNextAITurn()
+        unexplored = next(card for card in ALL_CARDS if card not in self.search.root.children[moves[0]].children)
+        self.game.history.extend([moves[0], unexplored])
+        state = node.state.clone()
+        state.history = self.game.history
+        self.assertIsNone(self.search.reroot(state))
+
+    def test_new_gambit_starts_fresh(self):
+        (moves, node) = self.walkToNextAITurn()
+        state = node.state.clone()
+        state.history = list(moves)
+        self.assertIsNone(self.search.reroot(state))
+
+class TestRace(unittest.TestCase):
+    def setUp(self):
+        random.seed(2)
+        self.previous = Deciders.table
+        Deciders.use(Deciders.RandomDecider())
+        self.game = TDA(3, 10, [BlueCard(Value(5)), RedCard(Value(6)), SilverCard(Value(1)), GoldCard(Value(9)), BlueCard(Value(2)), WhiteCard(Value(11))])
+
+    def tearDown(self):
+        Deciders.use(self.previous)
+
+    def test_race_shares_one_budget(self):
+        search = MCTS(400, 10)
+        grown = []
+        iterate = search.iterate
+        def counting(root, iters, deadline, table=None):
+            grown.append((root, iters))
+            iterate(root, iters, deadline, table)
+        search.iterate = counting
+        candidates = []
+        for card in self.game.AIPlayer.cards[:4]:
+            candidate = self.game.clone()
+            candidate.turn = 2
+            candidate.AIPlayer.cards.remove(card)
+            candidate.ante = Ante([card, RedCard(Value(3)), BlueCard(Value(2))])
+            candidates.append((card, candidate))
+        (option, score) = search.race(candidates)
+        self.assertIn(option, self.game.AIPlayer.cards[:4])
+        # two rounds: four candidates, then the better two
+        self.assertEqual(len(grown), 6)
+        self.assertLessEqual(sum(iters for (root, iters) in grown), 400)
+
+    def test_ante_returns_card_from_hand(self):
+        with patch("game.AIPlayer.MCTS", lambda iters, time, *args, **kwargs: MCTS(60, time, *args, **kwargs)):
+            anteCard = self.game.AIPlayer.ante(self.game)
+        self.assertEqual(len(self.game.AIPlayer.cards), 5)
+        self.assertIn(anteCard, [BlueCard(Value(5)), RedCard(Value(6)), SilverCard(Value(1)), BlueCard(Value(2))])
+
+    def test_decide_card_meets_latency_target(self):
+        self.game.ante = Ante([GoldCard(Value(2)), RedCard(Value(3)), BlueCard(Value(4))])
+        self.game.turn = 0
+        self.game.AIPlayer.decisionTime = 0.5
+        gold = self.game.AIPlayer.gold
+        start = time.time()
+        card = self.game.AIPlayer.decideCard(self.game, Value(4), True)
+        self.assertLess(time.time() - start, 1.5)
+        if card is None:
+            self.assertEqual(self.game.AIPlayer.gold, gold - 5)
+        else:
+            self.assertTrue(card.good and card.value.value > 4)
+            self.assertEqual(len(self.game.AIPlayer.cards), 5)
+
+    def test_decide_card_without_options_pays(self):
+        self.game.ante = Ante([GoldCard(Value(2)), RedCard(Value(3)), BlueCard(Value(4))])
+        with patch("game.AIPlayer.MCTS") as search:
+            self.assertIsNone(self.game.AIPlayer.decideCard(self.game, Value(13), True))
+        search.assert_not_called()
+        self.assertEqual(self.game.AIPlayer.gold, 25)
+
+@unittest.skipUnless(BatchRollout.available, "NumPy is not installed")
+class TestBatchRollout(unittest.TestCase):
+    def setUp(self):
+        random.seed(4)
+        self.game = TDA(4, 10, [BlueCard(Value(5)), RedCard(Value(6)), SilverCard(Value(1)), GoldCard(Value(9)), CopperCard(Value(2)), WhiteCard(Value(11))])
+        self.game.ante = Ante([BrassCard(Value(7)), GreenCard(Value(3)), BlackCard(Value(4)), BronzeCard(Value(8))])
+        self.game.turn = 1
+        self.game.players[0].flight.addCard(RedCard(Value(12)), self.game.ante, self.game.players[0])
+
+    def scalarRollouts(self, n):
+        search = MCTS(1, 1)
+        return [search.rollout(self.game)[1] for _ in range(n)]
+
+    def test_matches_scalar_rollouts(self):
+        import numpy as np
+        scalar = np.array(self.scalarRollouts(2000))
+        batch = BatchRollout.rollouts(self.game, 20000)
+        self.assertEqual(batch.shape, (20000,))
+        error = np.sqrt(scalar.var()/len(scalar) + batch.var()/len(batch))
+        self.assertLess(abs(scalar.mean() - batch.mean()), 4*error)
+
+    def test_leaves_state_untouched(self):
+        before = self.game.stateHash()
+        BatchRollout.rollouts(self.game, 100)
+        self.assertEqual(self.game.stateHash(), before)
+
+    def test_search_counts_every_rollout(self):
+        search = MCTS(20, 10, batch=32)
+        root = search.grow(self.game)
+        self.assertEqual(root.visits, 20*32)
+        self.assertIn(search.search(self.game)[0], self.game.AIPlayer.cards)
+
 
 if __name__ == "__main__":
     unittest.main()